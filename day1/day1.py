@@ -1,6 +1,11 @@
+import heapq
+import os
+import tempfile
 import unittest
 from collections import Counter
+from itertools import groupby, islice
 
+import numpy as np
 from aocd.models import Puzzle
 
 puzzle = Puzzle(year=2024, day=1)
@@ -10,17 +15,113 @@ def parse(input_data):
     return tuple(zip(*map(lambda line: map(int, line.split("   ")), input_data.split("\n"))))
 
 
-def part1(input_data):
+def parse_np(input_data):
+    columns = np.fromstring(input_data, dtype=np.int64, sep=" ").reshape(-1, 2)
+    return columns[:, 0], columns[:, 1]
+
+
+def part1_np(input_data):
+    l, r = parse_np(input_data)
+    return int(np.abs(np.sort(l) - np.sort(r)).sum())
+
+
+def part2_np(input_data):
+    l, r = parse_np(input_data)
+    values, counts = np.unique(r, return_counts=True)
+    idx = np.searchsorted(values, l)
+    idx[idx == len(values)] = 0
+    found = values[idx] == l
+    return int((l[found] * counts[idx[found]]).sum())
+
+
+def part1(input_data, vectorized=False):
+    if vectorized:
+        return part1_np(input_data)
     l, r = parse(input_data)
     return sum(map(lambda l: abs(l[0] - l[1]), zip(sorted(l), sorted(r))))
 
 
-def part2(input_data):
+def part2(input_data, vectorized=False):
+    if vectorized:
+        return part2_np(input_data)
     l, r = parse(input_data)
     counter = Counter(r)
     return sum(map(lambda key: key * counter[key], l))
 
 
+def spill_runs(path, directory, chunk_size):
+    runs = ([], [])
+    with open(path) as file:
+        while True:
+            chunk = list(islice(file, chunk_size))
+            if not chunk:
+                return runs
+            columns = zip(*map(lambda line: map(int, line.split()), filter(str.strip, chunk)))
+            for column, values in zip(runs, columns):
+                run = os.path.join(directory, f"run{len(runs[0]) + len(runs[1])}")
+                write_run(run, sorted(values))
+                column.append(run)
+
+
+def write_run(path, values):
+    with open(path, "w") as out:
+        out.writelines(f"{value}\n" for value in values)
+
+
+def read_run(path):
+    with open(path) as file:
+        for line in file:
+            yield int(line)
+
+
+def merge_runs(runs, fan_in):
+    # merge passes of at most fan_in runs keep the number of open files bounded
+    while len(runs) > fan_in:
+        merged = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            run = group[0] + "m"
+            write_run(run, heapq.merge(*map(read_run, group)))
+            for done in group:
+                os.remove(done)
+            merged.append(run)
+        runs = merged
+    return heapq.merge(*map(read_run, runs))
+
+
+def sorted_columns(path, directory, chunk_size, fan_in):
+    left, right = spill_runs(path, directory, chunk_size)
+    return merge_runs(left, fan_in), merge_runs(right, fan_in)
+
+
+def count_runs(values):
+    for value, group in groupby(values):
+        yield value, sum(1 for _ in group)
+
+
+def part1_file(path, chunk_size=1_000_000, fan_in=64):
+    with tempfile.TemporaryDirectory() as directory:
+        left, right = sorted_columns(path, directory, chunk_size, fan_in)
+        return sum(abs(l - r) for l, r in zip(left, right))
+
+
+def part2_file(path, chunk_size=1_000_000, fan_in=64):
+    with tempfile.TemporaryDirectory() as directory:
+        left, right = sorted_columns(path, directory, chunk_size, fan_in)
+        l_counts = count_runs(left)
+        r_counts = count_runs(right)
+        similarity = 0
+        r_value, r_count = next(r_counts, (None, 0))
+        for l_value, l_count in l_counts:
+            while r_value is not None and r_value < l_value:
+                r_value, r_count = next(r_counts, (None, 0))
+            if r_value is None:
+                break
+            if r_value == l_value:
+                similarity += l_value * l_count * r_count
+        return similarity
+
+
 class Day1(unittest.TestCase):
 
     def test_part1_example(self):
@@ -35,6 +136,24 @@ class Day1(unittest.TestCase):
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
+    def test_vectorized_example(self):
+        self.assertEqual(11, part1(puzzle.examples[0].input_data, vectorized=True))
+        self.assertEqual(31, part2(puzzle.examples[0].input_data, vectorized=True))
+
+    def test_vectorized_matches(self):
+        self.assertEqual(part1(puzzle.input_data), part1(puzzle.input_data, vectorized=True))
+        self.assertEqual(part2(puzzle.input_data), part2(puzzle.input_data, vectorized=True))
+
+    def test_external_sort_example(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "input.txt")
+            with open(path, "w") as file:
+                file.write(puzzle.examples[0].input_data)
+            self.assertEqual(11, part1_file(path, chunk_size=2))
+            self.assertEqual(31, part2_file(path, chunk_size=2))
+            self.assertEqual(11, part1_file(path, chunk_size=1, fan_in=2))
+            self.assertEqual(31, part2_file(path, chunk_size=1, fan_in=2))
+
 
 if __name__ == '__main__':
     suite = unittest.defaultTestLoader.loadTestsFromTestCase(Day1)
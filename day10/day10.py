@@ -1,5 +1,7 @@
 import unittest
+import tracemalloc
 
+import numpy as np
 from aocd.models import Puzzle
 
 puzzle = Puzzle(year=2024, day=10)
@@ -18,6 +20,12 @@ def parse(input_data):
     return grid
 
 
+def parse_np(input_data):
+    lines = input_data.splitlines()
+    grid = np.frombuffer("".join(lines).encode(), dtype=np.uint8).reshape(len(lines), -1)
+    return np.where(grid == ord('.'), -1, grid.astype(np.int16) - ord('0')).astype(np.int8)
+
+
 DIR = [
     (-1, 0),
     (1, 0),
@@ -26,7 +34,66 @@ DIR = [
 ]
 
 
+def by_height(data):
+    layers = [[] for _ in range(10)]
+    for y, row in enumerate(data):
+        for x, c in enumerate(row):
+            if c != '.':
+                layers[c].append((y, x))
+    return layers
+
+
+def climb(data, top, combine):
+    # from the summits down, every cell combines (dy, dx, value) of its neighbours one step higher,
+    # only the layer above the current one is kept
+    layers = by_height(data)
+    above = {cell: top(cell) for cell in layers[9]}
+    for height in range(8, -1, -1):
+        current = {}
+        for sy, sx in layers[height]:
+            current[(sy, sx)] = combine([(dy, dx, above[(sy + dy, sx + dx)]) for dy, dx in DIR
+                                         if (sy + dy, sx + dx) in above])
+        above = current
+    return list(above.values())
+
+
+# a summit is at most 9 steps away, so summit sets are bitsets over a 19x19 window centred on the cell
+WINDOW = 19
+
+
+def merge_summits(neighbours):
+    # bit (sy - y + 9) * WINDOW + (sx - x + 9), moving the window by one neighbour step is a shift
+    reached = 0
+    for dy, dx, summits in neighbours:
+        shift = dy * WINDOW + dx
+        reached |= summits << shift if shift >= 0 else summits >> -shift
+    return reached
+
+
 def part1(input_data):
+    data = parse(input_data)
+    summits = climb(data, lambda cell: 1 << (9 * WINDOW + 9), merge_summits)
+    return sum(reached.bit_count() for reached in summits)
+
+
+def ratings_np(heights, dtype=np.uint64):
+    # trails from each cell of the current layer, use dtype=object when counts can overflow
+    trails = (heights == 9).astype(dtype)
+    for height in range(8, -1, -1):
+        padded = np.pad(trails, 1)
+        above = padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+        trails = np.where(heights == height, above, 0).astype(dtype)
+    return trails
+
+
+def part2(input_data, vectorized=False):
+    if vectorized:
+        return int(ratings_np(parse_np(input_data)).sum())
+    data = parse(input_data)
+    return sum(climb(data, lambda cell: 1, lambda neighbours: sum(trails for _, _, trails in neighbours)))
+
+
+def part1_dfs(input_data):
     data = parse(input_data)
     visited = set()
 
@@ -56,7 +123,7 @@ def part1(input_data):
     return scores
 
 
-def part2(input_data):
+def part2_dfs(input_data):
     data = parse(input_data)
 
     def dfs(sy, sx, node):
@@ -132,6 +199,40 @@ class Day10(unittest.TestCase):
                    "10456732\n")
         self.assertEqual(81, part2(example))
 
+    def test_layered_matches_dfs(self):
+        example = ("89010123\n"
+                   "78121874\n"
+                   "87430965\n"
+                   "96549874\n"
+                   "45678903\n"
+                   "32019012\n"
+                   "01329801\n"
+                   "10456732\n")
+        self.assertEqual(part1_dfs(example), part1(example))
+        self.assertEqual(part2_dfs(example), part2(example))
+
+    def test_part1_memory(self):
+        example = "\n".join("".join(str((x + y) % 10) for x in range(200)) for y in range(200))
+        tracemalloc.start()
+        try:
+            part1(example)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 16 * 1024 * 1024)
+
+    def test_part2_vectorized(self):
+        example = (".....0.\n"
+                   "..4321.\n"
+                   "..5..2.\n"
+                   "..6543.\n"
+                   "..7..4.\n"
+                   "..8765.\n"
+                   "..9....\n")
+        self.assertEqual(-1, parse_np(example)[0, 0])
+        self.assertEqual(3, part2(example, vectorized=True))
+        self.assertEqual(3, int(ratings_np(parse_np(example), dtype=object).sum()))
+
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
@@ -1,5 +1,6 @@
 import unittest
 
+import numpy as np
 from aocd.models import Puzzle
 
 puzzle = Puzzle(year=2024, day=2)
@@ -24,7 +25,32 @@ def is_safe(row):
         return False
 
 
-def part1(input_data):
+def parse_csr(input_data):
+    lengths = np.array([line.count(" ") + 1 for line in input_data.splitlines()])
+    values = np.fromstring(input_data, dtype=np.int32, sep=" ")
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    return values, offsets
+
+
+def are_safe(values, offsets):
+    starts = offsets[:-1]
+    diffs = np.diff(values, append=values[-1:])
+    boundary = np.zeros(len(values), dtype=bool)
+    boundary[offsets[1:] - 1] = True  # last level of a row has no diff inside it
+    info = np.iinfo(np.int32)
+    lo = np.minimum.reduceat(np.where(boundary, info.max, diffs), starts)
+    hi = np.maximum.reduceat(np.where(boundary, info.min, diffs), starts)
+    return ((1 <= lo) & (hi <= 3)) | ((-3 <= lo) & (hi <= -1))
+
+
+def part1_np(input_data):
+    values, offsets = parse_csr(input_data)
+    return int(are_safe(values, offsets).sum())
+
+
+def part1(input_data, vectorized=False):
+    if vectorized:
+        return part1_np(input_data)
     data = parse(input_data)
     safe = 0
     for row in data:
@@ -33,7 +59,36 @@ def part1(input_data):
     return safe
 
 
+def is_safe_without(row, sign, skip):
+    prev = None
+    for idx, num in enumerate(row):
+        if idx == skip:
+            continue
+        if prev is not None and not 1 <= (num - prev) * sign <= 3:
+            return False
+        prev = num
+    return True
+
+
+def is_safe_dampened(row):
+    for sign in (1, -1):
+        for idx in range(len(row) - 1):
+            if not 1 <= (row[idx + 1] - row[idx]) * sign <= 3:
+                # one of the levels of the first bad pair has to go
+                if is_safe_without(row, sign, idx) or is_safe_without(row, sign, idx + 1):
+                    return True
+                break
+        else:
+            return True
+    return False
+
+
 def part2(input_data):
+    data = parse(input_data)
+    return sum(1 for row in data if is_safe_dampened(row))
+
+
+def part2_brute_force(input_data):
     data = parse(input_data)
     safe = 0
     for row in data:
@@ -56,12 +111,23 @@ class Day2(unittest.TestCase):
     def test_part1(self):
         puzzle.answer_a = part1(puzzle.input_data)
 
+    def test_part1_vectorized(self):
+        self.assertEqual(2, part1(puzzle.examples[0].input_data, vectorized=True))
+        self.assertEqual(2, part1("1 2\n7\n1 5", vectorized=True))
+        self.assertEqual(part1(puzzle.input_data), part1(puzzle.input_data, vectorized=True))
+
     def test_part2_example(self):
         self.assertEqual(4, part2(puzzle.examples[0].input_data))
 
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
+    def test_dampened_matches_brute_force(self):
+        rows = ["1 5 2 3 4", "5 1 2 3 4", "1 2 3 4 9", "9 1 2 3 4", "1 2 2 3 3", "3 2 4 5 6", "1 1", "7"]
+        for row in rows:
+            self.assertEqual(part2_brute_force(row), part2(row), row)
+        self.assertEqual(part2_brute_force(puzzle.input_data), part2(puzzle.input_data))
+
 
 if __name__ == '__main__':
     suite = unittest.defaultTestLoader.loadTestsFromTestCase(Day2)
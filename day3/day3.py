@@ -1,36 +1,90 @@
+import mmap
+import os
 import re
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor
 
 from aocd.models import Puzzle
 
 puzzle = Puzzle(year=2024, day=3)
 
 
+INSTRUCTION = re.compile(r"(?P<mul>mul\((?P<l>\d{1,3}),(?P<r>\d{1,3})\))|(?P<do>do\(\))|(?P<dont>don't\(\))")
+
+
+BYTES_INSTRUCTION = re.compile(INSTRUCTION.pattern.encode())
+TOKEN_OVERLAP = len("mul(123,456)") - 1
+
+
 def parse(input_data):
     matches = re.findall(r'mul\((\d{1,3}),(\d{1,3})\)', input_data)
     return [(int(l), int(r)) for (l, r) in matches]
 
 
+def products(input_data, conditional=False):
+    enabled = True
+    for match in INSTRUCTION.finditer(input_data):
+        kind = match.lastgroup
+        if kind == "mul":
+            if enabled:
+                yield int(match["l"]) * int(match["r"])
+        elif conditional:
+            enabled = kind == "do"
+
+
 def part1(input_data):
-    data = parse(input_data)
-    return sum(map(lambda x: x[0] * x[1], data))
+    return sum(products(input_data))
 
 
 def part2(input_data):
-    matches = re.findall(r'(mul\(\d{1,3},\d{1,3}\))|(do\(\))|(don\'t\(\))', input_data)
-    numbers = []
-    enabled = True
-    for match in matches:
-        if match[0] != "" and enabled:
-            mul = re.findall(r'mul\((\d{1,3}),(\d{1,3})\)', match[0])
-            (l, r) = mul[0]
-            numbers.append((int(l), int(r)))
-        elif match[1] != "":
-            enabled = True
-        elif match[2] != "":
-            enabled = False
-
-    return sum(map(lambda x: x[0] * x[1], numbers))
+    return sum(products(input_data, conditional=True))
+
+
+def scan_chunk(path, start, end):
+    # no instruction contains another one, so a match starting inside the chunk is the same as in a full scan
+    total = 0
+    sums = {True: 0, False: 0}
+    state = None
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for match in BYTES_INSTRUCTION.finditer(data, start, min(end + TOKEN_OVERLAP, len(data))):
+            if match.start() >= end:
+                break
+            kind = match.lastgroup
+            if kind == "mul":
+                product = int(match["l"]) * int(match["r"])
+                total += product
+                for entry in sums:
+                    if (entry if state is None else state):
+                        sums[entry] += product
+            else:
+                state = kind == "do"
+    return total, sums[True], sums[False], state
+
+
+def scan_file(path, chunk_size=64 * 1024 * 1024, workers=None):
+    size = os.path.getsize(path)
+    starts = list(range(0, size, chunk_size))
+    ends = [min(start + chunk_size, size) for start in starts]
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(scan_chunk, [path] * len(starts), starts, ends)
+        total = 0
+        conditional = 0
+        enabled = True
+        for chunk_total, enabled_sum, disabled_sum, state in results:
+            total += chunk_total
+            conditional += enabled_sum if enabled else disabled_sum
+            if state is not None:
+                enabled = state
+    return total, conditional
+
+
+def part1_file(path, chunk_size=64 * 1024 * 1024, workers=None):
+    return scan_file(path, chunk_size, workers)[0]
+
+
+def part2_file(path, chunk_size=64 * 1024 * 1024, workers=None):
+    return scan_file(path, chunk_size, workers)[1]
 
 
 class Day3(unittest.TestCase):
@@ -47,6 +101,20 @@ class Day3(unittest.TestCase):
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
+    def test_products(self):
+        example = "don't()mul(1,2)do()mul(3,4)mul(1000,1)"
+        self.assertEqual([2, 12], list(products(example)))
+        self.assertEqual([12], list(products(example, conditional=True)))
+
+    def test_scan_file(self):
+        example = "xmul(2,4)&mul[3,7]!^don't()_mul(5,5)+mul(32,64](mul(11,8)undo()?mul(8,5))"
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.txt")
+            with open(path, "w") as file:
+                file.write(example)
+            for chunk_size in range(1, len(example) + 1):
+                self.assertEqual((161, 48), scan_file(path, chunk_size, workers=2))
+
 
 
 if __name__ == '__main__':
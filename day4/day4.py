@@ -1,6 +1,8 @@
 import re
 import unittest
+from collections import deque
 
+import numpy as np
 from aocd.models import Puzzle
 
 puzzle = Puzzle(year=2024, day=4)
@@ -46,7 +48,60 @@ def count_diagonal(data):
     return count_horizontal(diags)
 
 
+def build_automaton(patterns):
+    goto = [{}]
+    out = [0]
+    for pattern in patterns:
+        state = 0
+        for c in pattern:
+            if c not in goto[state]:
+                goto[state][c] = len(goto)
+                goto.append({})
+                out.append(0)
+            state = goto[state][c]
+        out[state] += 1
+    # Aho-Corasick with failure links folded into a dense transition table
+    table = [0] * (256 * len(goto))
+    fail = [0] * len(goto)
+    queue = deque([0])
+    while queue:
+        state = queue.popleft()
+        for c in range(256):
+            fallback = table[fail[state] * 256 + c] if state != 0 else 0
+            if c in goto[state]:
+                child = goto[state][c]
+                fail[child] = fallback
+                out[child] += out[fallback]
+                table[state * 256 + c] = child
+                queue.append(child)
+            else:
+                table[state * 256 + c] = fallback
+    return table, out
+
+
+def count_words(data, words):
+    width = len(data[0])
+    buffer = memoryview(("\n".join(data) + "\n").encode())
+    patterns = [word.encode() for word in words] + [word[::-1].encode() for word in words]
+    table, out = build_automaton(patterns)
+    # with a newline closing every row, vertical and both diagonal lines are strided views separated by newlines
+    lines = [buffer]
+    for step in (width + 1, width + 2, width):
+        lines.extend(buffer[start::step] for start in range(step))
+    count = 0
+    for line in lines:
+        state = 0
+        for c in line:
+            state = table[state * 256 + c]
+            count += out[state]
+    return count
+
+
 def part1(input_data):
+    return count_words(parse(input_data), ["XMAS"])
+
+
+def part1_rotations(input_data):
     data = parse(input_data)
     count = 0
     for _ in range(4):
@@ -78,8 +133,30 @@ def count_x(data):
                 count += 1
     return count
 
-def part2(input_data):
+def to_array(data):
+    return np.frombuffer("".join(data).encode(), dtype=np.uint8).reshape(len(data), -1)
+
+
+def count_stencil(data, mask, rotations=4):
+    size = max(len(mask), len(mask[0]))
+    square = to_array([line.ljust(size, ".") for line in mask] + ["." * size] * (size - len(mask)))
+    masks = np.stack([np.rot90(square, k) for k in range(rotations)])
+    # zero padding never equals a mask character, so only placements inside the grid match
+    grid = np.pad(to_array(data), size - 1)
+    height = grid.shape[0] - size + 1
+    width = grid.shape[1] - size + 1
+    matches = np.ones((rotations, height, width), dtype=bool)
+    for my in range(size):
+        for mx in range(size):
+            cell = masks[:, my, mx, None, None]
+            matches &= (cell == ord(".")) | (grid[None, my:my + height, mx:mx + width] == cell)
+    return int(matches.sum())
+
+
+def part2(input_data, vectorized=False):
     data = parse(input_data)
+    if vectorized:
+        return count_stencil(data, ["M.S", ".A.", "M.S"])
     count = 0
     for _ in range(4):
         count += count_x(data)
@@ -108,12 +185,23 @@ class Day4(unittest.TestCase):
     def test_part1_example2(self):
         self.assertEqual(18, part1(self.example))
 
+    def test_count_words(self):
+        self.assertEqual(2, count_words(["ABA"], ["AB"]))
+        self.assertEqual(8, count_words(["X"], ["X"]))
+        self.assertEqual(part1_rotations(self.example), count_words(parse(self.example), ["XMAS"]))
+        self.assertEqual(3, count_words(["ABC", "BCD"], ["BC", "ABCD"]))
+
     def test_part1(self):
         puzzle.answer_a = part1(puzzle.input_data)
 
     def test_part2_example(self):
         self.assertEqual(9, part2(self.example))
 
+    def test_part2_vectorized(self):
+        self.assertEqual(9, part2(self.example, vectorized=True))
+        self.assertEqual(1, count_stencil(["AB", "CD"], ["AB"]))
+        self.assertEqual(4, count_stencil(["AB", "BA"], ["A", "B"]))
+
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
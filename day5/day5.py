@@ -1,6 +1,8 @@
+import heapq
 import re
 import unittest
 from collections import defaultdict
+from functools import cmp_to_key
 
 from aocd.models import Puzzle
 
@@ -25,12 +27,103 @@ def verify(page, rules):
                 return False, (page2, page1)
     return True, None
 
+def build_index(rules):
+    return {(before, after) for before, afters in rules.items() for after in afters}
+
+
+def compare(index):
+    def cmp(page1, page2):
+        if (page1, page2) in index:
+            return -1
+        if (page2, page1) in index:
+            return 1
+        return 0
+
+    return cmp
+
+
+def is_ordered(page, index):
+    # every pair of pages in an update has a rule, so checking neighbours is enough
+    return all((page2, page1) not in index for page1, page2 in zip(page, page[1:]))
+
+
+def fix_order(page, index):
+    return sorted(page, key=cmp_to_key(compare(index)))
+
+
+def is_ordered_pairwise(page, index):
+    return not any((page2, page1) in index for idx, page1 in enumerate(page) for page2 in page[idx + 1:])
+
+
+def order_pages(page, index):
+    # topological sort over the rules among the update's pages, ties keep the update's order
+    successors = defaultdict(list)
+    incoming = {num: 0 for num in page}
+    for before in page:
+        for after in page:
+            if (before, after) in index:
+                successors[before].append(after)
+                incoming[after] += 1
+    ready = [(idx, num) for idx, num in enumerate(page) if incoming[num] == 0]
+    heapq.heapify(ready)
+    position = {num: idx for idx, num in enumerate(page)}
+    ordered = []
+    while ready:
+        _, num = heapq.heappop(ready)
+        ordered.append(num)
+        for after in successors[num]:
+            incoming[after] -= 1
+            if incoming[after] == 0:
+                heapq.heappush(ready, (position[after], after))
+    if len(ordered) != len(page):
+        raise Exception("Cycle detected")
+    return ordered
+
+
+class RuleBook:
+    def __init__(self, index=()):
+        self.index = set(index)
+        self.verdicts = {}
+        self.cached_by_page = defaultdict(set)
+
+    def add(self, before, after):
+        if (before, after) not in self.index:
+            self.index.add((before, after))
+            self.invalidate(before, after)
+
+    def remove(self, before, after):
+        if (before, after) in self.index:
+            self.index.remove((before, after))
+            self.invalidate(before, after)
+
+    def invalidate(self, page1, page2):
+        # only updates containing both pages can change their verdict
+        for key in self.cached_by_page[page1] & self.cached_by_page[page2]:
+            del self.verdicts[key]
+            for page in key:
+                self.cached_by_page[page].discard(key)
+
+    def check(self, update):
+        key = tuple(update)
+        if key not in self.verdicts:
+            # rules can be removed, so neighbouring pages alone do not decide the order
+            self.verdicts[key] = is_ordered_pairwise(key, self.index)
+            for page in key:
+                self.cached_by_page[page].add(key)
+        return self.verdicts[key]
+
+    def fix(self, update):
+        if self.check(update):
+            return list(update)
+        return order_pages(list(update), self.index)
+
+
 def part1(input_data):
     rules, pages = parse(input_data)
+    index = build_index(rules)
     count = 0
     for page in pages:
-        correct, _ = verify(page, rules)
-        if correct:
+        if is_ordered(page, index):
             count += page[len(page) // 2]
     return count
 
@@ -88,7 +181,7 @@ def part2_incorrect(input_data):
         count += correct_order[len(correct_order) // 2]
     return count
 
-def part2(input_data):
+def part2_swaps(input_data):
     rules, pages = parse(input_data)
     count = 0
     for page in pages:
@@ -98,6 +191,16 @@ def part2(input_data):
             count += fixed[len(fixed) // 2]
     return count
 
+def part2(input_data):
+    rules, pages = parse(input_data)
+    index = build_index(rules)
+    count = 0
+    for page in pages:
+        if not is_ordered(page, index):
+            fixed = fix_order(page, index)
+            count += fixed[len(fixed) // 2]
+    return count
+
 class Day5(unittest.TestCase):
 
     def test_part1_example(self):
@@ -116,6 +219,43 @@ class Day5(unittest.TestCase):
     def test_part2_example(self):
         self.assertEqual(123, part2(puzzle.examples[0].input_data))
 
+    def test_part2_swaps_example(self):
+        self.assertEqual(123, part2_swaps(puzzle.examples[0].input_data))
+
+    def test_fix_order(self):
+        rules, pages = parse(puzzle.examples[0].input_data)
+        index = build_index(rules)
+        for page in pages:
+            fixed = fix_order(page, index)
+            self.assertTrue(is_ordered(fixed, index))
+            self.assertEqual(is_ordered(page, index), verify(page, rules)[0])
+            self.assertEqual(fix_page(list(page), rules), fixed)
+
+    def test_rule_book(self):
+        rules, pages = parse(puzzle.examples[0].input_data)
+        book = RuleBook(build_index(rules))
+        self.assertEqual([True, True, True, False, False, False], list(map(book.check, pages)))
+        self.assertEqual([97, 75, 47, 61, 53], book.fix(pages[3]))
+        book.remove(97, 75)
+        book.add(75, 97)
+        self.assertEqual(True, book.check(pages[3]))
+        self.assertIn(tuple(pages[1]), book.verdicts)
+        self.assertNotIn(tuple(pages[5]), book.verdicts)
+        self.assertEqual([75, 97, 47, 29, 13], book.fix(pages[5]))
+
+    def test_rule_book_removed_rules(self):
+        book = RuleBook({(1, 2), (2, 3), (1, 3)})
+        self.assertEqual(True, book.check([1, 2, 3]))
+        book.remove(1, 2)
+        book.remove(2, 3)
+        self.assertEqual(True, book.check([1, 2, 3]))
+        self.assertEqual(False, book.check([3, 1, 2]))
+        self.assertEqual([1, 3, 2], book.fix([3, 1, 2]))
+        book.remove(1, 3)
+        book.add(3, 1)
+        self.assertEqual(False, book.check([1, 2, 3]))
+        self.assertEqual([2, 3, 1], book.fix([1, 2, 3]))
+
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
@@ -1,4 +1,6 @@
+import os
 import unittest
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 
 from aocd.models import Puzzle
@@ -37,6 +39,61 @@ def dir_to_delta(dir):
     }.get(dir)
 
 
+DIRECTIONS = '^>v<'
+DELTAS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+
+
+def wall_bounds(line):
+    # -1, every wall position and len(line), consecutive pairs enclose the free segments
+    bounds = [-1]
+    idx = line.find('#')
+    while idx != -1:
+        bounds.append(idx)
+        idx = line.find('#', idx + 1)
+    bounds.append(len(line))
+    return bounds
+
+
+def build_jumps(grid):
+    height, width = len(grid), len(grid[0])
+    stops = [[0] * (height * width) for _ in DELTAS]
+    exits = [[False] * (height * width) for _ in DELTAS]
+    # every free segment of a row or column shares its stops, so it is filled with one slice assignment
+    for y, line in enumerate(grid):
+        bounds = wall_bounds(''.join(line))
+        for left, right in zip(bounds, bounds[1:]):
+            start, end, size = y * width + left + 1, y * width + right, right - left - 1
+            stops[1][start:end], exits[1][start:end] = [end - 1] * size, [right == width] * size
+            stops[3][start:end], exits[3][start:end] = [start] * size, [left == -1] * size
+    for x, line in enumerate(zip(*grid)):
+        bounds = wall_bounds(''.join(line))
+        for top, bottom in zip(bounds, bounds[1:]):
+            start, end, size = (top + 1) * width + x, bottom * width + x, bottom - top - 1
+            stops[0][start:end:width], exits[0][start:end:width] = [start] * size, [top == -1] * size
+            stops[2][start:end:width], exits[2][start:end:width] = [end - width] * size, [bottom == height] * size
+    return stops, exits
+
+
+def simulate_jumps(jumps, width, y, x, d, oy, ox, prefix=None):
+    stops, exits = jumps
+    pos = y * width + x
+    visited = set()
+    while True:
+        state = pos * 4 + d
+        if state in visited or (prefix is not None and prefix[state >> 3] >> (state & 7) & 1):
+            return True
+        visited.add(state)
+        stop, leaves = stops[d][pos], exits[d][pos]
+        py, px = divmod(pos, width)
+        sy, sx = divmod(stop, width)
+        if min(py, sy) <= oy <= max(py, sy) and min(px, sx) <= ox <= max(px, sx):
+            dy, dx = DELTAS[d]
+            stop, leaves = (oy - dy) * width + ox - dx, False
+        if leaves:
+            return False
+        pos, d = stop, (d + 1) % 4
+
+
 def part1(input_data):
     grid, (y, x) = parse(input_data)
     visited = set()
@@ -76,21 +133,60 @@ def simulate(grid, y, x, dir, oy, ox):
 
 def part2(input_data):
     grid, (y, x) = parse(input_data)
-    dir = grid[y][x]
+    height, width = len(grid), len(grid[0])
+    d = DIRECTIONS.index(grid[y][x])
+    jumps = build_jumps(grid)
+    # states y*W*4 + x*4 + d walked by the unobstructed guard so far
+    prefix = bytearray((height * width * 4 + 7) // 8)
+    reached = bytearray(height * width)
+    reached[y * width + x] = 1
     count = 0
-    _, visited = simulate(grid, y, x, dir,-1,-1)
-    to_consider = set()
-    for oy, ox, _ in visited:
-        to_consider.add((oy, ox))
-    for idx, (oy, ox) in enumerate(to_consider):
-        if (oy, ox) == (y, x):  # skip start pos
-            continue
-        if grid[oy][ox] == '#':  # skip already taken
+    while True:
+        dy, dx = DELTAS[d]
+        ny, nx = y + dy, x + dx
+        if not (0 <= ny < height and 0 <= nx < width):
+            return count
+        state = (y * width + x) * 4 + d
+        if prefix[state >> 3] >> (state & 7) & 1:
+            # the unobstructed guard already walks in a loop, every cell on it has been tried
+            return count
+        if grid[ny][nx] == '#':
+            prefix[state >> 3] |= 1 << (state & 7)
+            d = (d + 1) % 4
             continue
-        looped, _ = simulate(grid, y, x, dir, oy, ox)
-        if looped:
-            count += 1
-    return count
+        if not reached[ny * width + nx]:
+            # the path is unchanged until the guard first reaches the obstacle
+            reached[ny * width + nx] = 1
+            if simulate_jumps(jumps, width, y, x, d, ny, nx, prefix):
+                count += 1
+        prefix[state >> 3] |= 1 << (state & 7)
+        y, x = ny, nx
+
+
+worker = {}
+
+
+def init_worker(cells, width, y, x, d):
+    grid = [cells[i:i + width].decode() for i in range(0, len(cells), width)]
+    worker.update(jumps=build_jumps(grid), width=width, start=(y, x, d))
+
+
+def count_loops(candidates):
+    y, x, d = worker['start']
+    return sum(1 for oy, ox in candidates if simulate_jumps(worker['jumps'], worker['width'], y, x, d, oy, ox))
+
+
+def part2_parallel(input_data, workers=None):
+    grid, (y, x) = parse(input_data)
+    dir = grid[y][x]
+    _, visited = simulate(grid, y, x, dir, -1, -1)
+    candidates = sorted({(oy, ox) for oy, ox, _ in visited if (oy, ox) != (y, x) and grid[oy][ox] != '#'})
+    # the grid is sent once per worker, tasks only carry candidate positions
+    cells = ''.join(''.join(line) for line in grid).encode()
+    chunks = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers, initializer=init_worker,
+                             initargs=(cells, len(grid[0]), y, x, DIRECTIONS.index(dir))) as executor:
+        return sum(executor.map(count_loops, [candidates[i::chunks] for i in range(chunks)]))
 
 
 class Day6(unittest.TestCase):
@@ -123,9 +219,27 @@ class Day6(unittest.TestCase):
             1, '^', 0, 1)
         self.assertEqual(False, result)
 
+    def test_loop_detection_jumps(self):
+        grid = [
+            [".", ".", ".", "."],
+            [".", ".", ".", "#"],
+            ["#", ".", ".", "."],
+            [".", ".", "#", "."]
+        ]
+        jumps = build_jumps(grid)
+        self.assertEqual(True, simulate_jumps(jumps, 4, 1, 1, 0, 0, 1))
+        self.assertEqual(False, simulate_jumps(jumps, 4, 1, 1, 0, -1, -1))
+
+    def test_part2_looping_guard(self):
+        # the guard circles the middle of the lab, every obstacle on that circle lets the guard out
+        self.assertEqual(0, part2(".#..\n...#\n#^..\n..#."))
+
     def test_part2_example(self):
         self.assertEqual(6, part2(puzzle.examples[0].input_data))
 
+    def test_part2_parallel_example(self):
+        self.assertEqual(6, part2_parallel(puzzle.examples[0].input_data, workers=2))
+
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
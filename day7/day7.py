@@ -1,19 +1,24 @@
+import os
+import tempfile
+import time
 import unittest
-from itertools import combinations_with_replacement, product
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations_with_replacement, islice, product
 
 from aocd.models import Puzzle
+from tqdm import tqdm
 
 puzzle = Puzzle(year=2024, day=7)
 
 
+def parse_line(line):
+    result, numbers = line.split(": ")
+    return int(result), list(map(int, numbers.split(" ")))
+
+
 def parse(input_data):
-    calibrations = []
-    for line in input_data.splitlines():
-        result, numbers = line.split(": ")
-        numbers = list(map(int, numbers.split(" ")))
-        result = int(result)
-        calibrations.append((result, numbers))
-    return calibrations
+    return list(map(parse_line, input_data.splitlines()))
 
 
 def add(a, b):
@@ -60,11 +65,79 @@ def is_possible(result, numbers):
     return possibilities > 0
 
 
+def unadd(target, n):
+    return target - n if target >= n else None
+
+
+def unmul(target, n):
+    if n == 0:
+        return ANY if target == 0 else None
+    return target // n if target % n == 0 else None
+
+
+def unconcat(target, n):
+    power = 10
+    while power <= n:
+        power *= 10
+    return target // power if target % power == n else None
+
+
+# inverse returns the left operand that yields target, None if there is none or ANY if every value does;
+# grows(n) tells whether the operator never gives less than a non-negative left operand for right operand n,
+# forward search only drops values above target when that holds for every remaining operand
+Operator = namedtuple('Operator', ['forward', 'inverse', 'grows'], defaults=(None, None))
+ANY = object()
+
+OPERATORS = {
+    '+': Operator(add, unadd, lambda n: n >= 0),
+    '*': Operator(mul, unmul, lambda n: n >= 1),
+    '|': Operator(concat, unconcat, lambda n: n >= 0),
+}
+
+
+def solve_backward(result, numbers, operators):
+    def solve(target, idx):
+        if idx == 0:
+            return target == numbers[0]
+        for operator in operators:
+            previous = operator.inverse(target, numbers[idx])
+            if previous is ANY or (previous is not None and solve(previous, idx - 1)):
+                return True
+        return False
+
+    return solve(result, len(numbers) - 1)
+
+
+def solve_forward(result, numbers, operators):
+    # bounded[idx] is True when no operand from idx on can bring a value back down
+    bounded = [True] * (len(numbers) + 1)
+    for idx in range(len(numbers) - 1, 0, -1):
+        bounded[idx] = bounded[idx + 1] and all(
+            operator.grows is not None and operator.grows(numbers[idx]) for operator in operators)
+    reachable = {numbers[0]}
+    for idx in range(1, len(numbers)):
+        reachable = {operator.forward(value, numbers[idx]) for value in reachable for operator in operators}
+        if bounded[idx + 1]:
+            reachable = {value for value in reachable if value <= result}
+    return result in reachable
+
+
+def solve(result, numbers, signs, registry=OPERATORS):
+    operators = [registry[sign] for sign in signs]
+    if all(operator.inverse is not None for operator in operators):
+        return solve_backward(result, numbers, operators)
+    return solve_forward(result, numbers, operators)
+
+
+def is_solvable(result, numbers, with_concat=False):
+    return solve(result, numbers, '+*|' if with_concat else '+*')
+
+
 def part1(input_data):
     calib = parse(input_data)
     total = 0
     for result, numbers in calib:
-        if is_possible(result, numbers):
+        if is_solvable(result, numbers):
             total += result
     return total
 
@@ -95,11 +168,59 @@ def part2(input_data):
     calib = parse(input_data)
     total = 0
     for result, numbers in calib:
-        if is_possible2(result, numbers, True):
+        if is_solvable(result, numbers, True):
             total += result
     return total
 
 
+def solve_batch(lines):
+    total1 = total2 = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        result, numbers = parse_line(line)
+        if is_solvable(result, numbers):
+            total1 += result
+            total2 += result
+        elif is_solvable(result, numbers, True):
+            total2 += result
+    return total1, total2, len(lines)
+
+
+def read_batches(path, batch_size):
+    with open(path) as file:
+        while batch := list(islice(file, batch_size)):
+            yield batch
+
+
+Throughput = namedtuple('Throughput', ['part1', 'part2', 'lines', 'seconds', 'lines_per_second'])
+
+
+def solve_file(path, batch_size=10_000, workers=None, progress=False):
+    totals = [0, 0, 0]
+    in_flight = 2 * (workers or os.cpu_count())
+    started = time.perf_counter()
+    with ProcessPoolExecutor(workers) as executor, tqdm(unit=' lines', disable=not progress) as counter:
+        def collect(done):
+            for future in done:
+                total1, total2, lines = future.result()
+                totals[0] += total1
+                totals[1] += total2
+                totals[2] += lines
+                counter.update(lines)
+
+        # only a bounded number of batches is read ahead of the workers
+        pending = set()
+        for batch in read_batches(path, batch_size):
+            if len(pending) >= in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(solve_batch, batch))
+        collect(wait(pending).done)
+    seconds = time.perf_counter() - started
+    return Throughput(*totals, seconds, totals[2] / seconds if seconds else 0.0)
+
+
 class Day7(unittest.TestCase):
 
     def test_part1_example(self):
@@ -111,6 +232,37 @@ class Day7(unittest.TestCase):
     def test_part2_example(self):
         self.assertEqual(11387, part2(puzzle.examples[0].input_data))
 
+    def test_is_solvable(self):
+        for result, numbers in parse(puzzle.examples[0].input_data):
+            self.assertEqual(is_possible(result, numbers), is_solvable(result, numbers))
+            self.assertEqual(is_possible2(result, numbers, True), is_solvable(result, numbers, True))
+        numbers = [7, 3, 12, 5, 9, 1, 4, 8, 2, 6, 11, 3, 5, 7, 2, 9, 4, 1, 8, 3, 6, 10]
+        self.assertEqual(True, is_solvable(int("".join(map(str, numbers))), numbers, True))
+        self.assertEqual(False, is_solvable(int("".join(map(str, numbers))) + 1, numbers, True))
+
+    def test_custom_operators(self):
+        registry = dict(OPERATORS)
+        registry['-'] = Operator(lambda a, b: a - b)
+        registry['%'] = Operator(lambda a, b: a % b)
+        registry['^'] = Operator(lambda a, b: a ^ b)
+        self.assertEqual(True, solve(2, [10, 3, 5], '-%', registry))
+        self.assertEqual(False, solve(3, [10, 3, 5], '-%', registry))
+        self.assertEqual(True, solve(0, [3, 2, 1], '+-', registry))
+        self.assertEqual(True, solve(1, [10, 5, 4], '-', registry))
+        self.assertEqual(True, solve(3, [10, 2, 0, 3], '+*^', registry))
+        self.assertEqual(False, solve(4, [10, 2, 0, 3], '+*^', registry))
+        self.assertEqual(solve_backward(3267, [81, 40, 27], [OPERATORS['+'], OPERATORS['*']]),
+                         solve_forward(3267, [81, 40, 27], [OPERATORS['+'], OPERATORS['*']]))
+
+    def test_solve_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "calibrations.txt")
+            with open(path, "w") as file:
+                file.write(puzzle.examples[0].input_data)
+            result = solve_file(path, batch_size=2, workers=2)
+            self.assertEqual((3749, 11387, 9), result[:3])
+            self.assertGreater(result.lines_per_second, 0)
+
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
@@ -1,7 +1,10 @@
+import sys
 import unittest
 from collections import defaultdict
 from itertools import combinations
+from math import gcd
 
+import numpy as np
 from aocd.models import Puzzle
 
 puzzle = Puzzle(year=2024, day=8)
@@ -17,24 +20,79 @@ def parse(input_data):
     return pos, len(grid) - 1, len(grid[0]) - 1
 
 
-def print_grid(positions, antinodes):
-    inv_pos = {}
+def render(positions, antinodes, y_max, x_max):
+    width = x_max + 2
+    frame = bytearray(b'.' * (x_max + 1) + b'\n') * (y_max + 1)
     for c, l in positions.items():
-        for p in l:
-            inv_pos[p] = c
-    for y in range(12):
-        for x in range(12):
-            if (y, x) in antinodes:
-                print('#', end='')
-            elif (y, x) in inv_pos:
-                print(inv_pos[(y, x)], end='')
+        for y, x in l:
+            frame[y * width + x] = ord(c)
+    for y, x in antinodes:
+        frame[y * width + x] = ord('#')
+    return frame.decode()
+
+
+def show(positions, antinodes, y_max, x_max):
+    sys.stdout.write(render(positions, antinodes, y_max, x_max))
+
+
+def antinode_bitmap(positions, y_max, x_max, harmonics=False):
+    bitmap = np.zeros((y_max + 1, x_max + 1), dtype=bool)
+    for antenna, locations in positions.items():
+        locations = np.array(locations)
+        if harmonics:
+            bitmap[locations[:, 0], locations[:, 1]] = True
+        # pairs are generated one antenna at a time so memory stays bounded by a single row of pairs
+        for idx in range(len(locations) - 1):
+            first = locations[idx]
+            second = locations[idx + 1:]
+            deltas = first - second
+            if harmonics:
+                steps = max(y_max, x_max) // np.abs(deltas).max(axis=1)
             else:
-                print('.', end='')
-        print()
+                steps = np.ones(len(deltas), dtype=int)
+            pair = np.repeat(np.arange(len(deltas)), steps)
+            multiples = (np.arange(len(pair)) - np.repeat(np.cumsum(steps) - steps, steps) + 1)[:, None]
+            for nodes in (first + multiples * deltas[pair], second[pair] - multiples * deltas[pair]):
+                inside = (0 <= nodes[:, 0]) & (nodes[:, 0] <= y_max) & (0 <= nodes[:, 1]) & (nodes[:, 1] <= x_max)
+                bitmap[nodes[inside, 0], nodes[inside, 1]] = True
+    return bitmap
+
 
+def antenna_lines(positions):
+    lines = {}
+    for antenna, locations in positions.items():
+        for (y1, x1), (y2, x2) in combinations(locations, 2):
+            divisor = gcd(y2 - y1, x2 - x1)
+            dy, dx = (y2 - y1) // divisor, (x2 - x1) // divisor
+            if dy < 0 or (dy == 0 and dx < 0):
+                dy, dx = -dy, -dx
+            # dx * y - dy * x is the same for every point on the line
+            lines.setdefault((dy, dx, dx * y1 - dy * x1), (y1, x1))
+    return lines
 
-def part1(input_data):
+
+def rasterize(y, x, dy, dx, y_max, x_max):
+    while 0 <= y - dy <= y_max and 0 <= x - dx <= x_max:
+        y, x = y - dy, x - dx
+    while 0 <= y <= y_max and 0 <= x <= x_max:
+        yield y, x
+        y, x = y + dy, x + dx
+
+
+def exact_antinodes(positions, y_max, x_max):
+    antinodes = set()
+    for (dy, dx, _), (y, x) in antenna_lines(positions).items():
+        antinodes.update(rasterize(y, x, dy, dx, y_max, x_max))
+    return antinodes
+
+
+def part1(input_data, vectorized=False, display=False):
     positions, y_max, x_max = parse(input_data)
+    if vectorized:
+        bitmap = antinode_bitmap(positions, y_max, x_max)
+        if display:
+            show(positions, zip(*np.nonzero(bitmap)), y_max, x_max)
+        return int(bitmap.sum())
     antinodes = set()
     for antenna, locations in positions.items():
         for (y1, x1), (y2, x2) in combinations(locations, 2):
@@ -46,12 +104,25 @@ def part1(input_data):
                 antinodes.add(a1)
             if 0 <= a2[0] <= y_max and 0 <= a2[1] <= x_max:
                 antinodes.add(a2)
-    print_grid(positions, antinodes)
+    if display:
+        show(positions, antinodes, y_max, x_max)
     return len(antinodes)
 
 
-def part2(input_data):
+def part2(input_data, vectorized=False, display=False, exact=False):
     positions, y_max, x_max = parse(input_data)
+    if exact:
+        antinodes = exact_antinodes(positions, y_max, x_max)
+        for antenna, locations in positions.items():
+            antinodes.update(locations)
+        if display:
+            show(positions, antinodes, y_max, x_max)
+        return len(antinodes)
+    if vectorized:
+        bitmap = antinode_bitmap(positions, y_max, x_max, harmonics=True)
+        if display:
+            show(positions, zip(*np.nonzero(bitmap)), y_max, x_max)
+        return int(bitmap.sum())
     antinodes = set()
     all_positions = set()
     for antenna, locations in positions.items():
@@ -75,7 +146,8 @@ def part2(input_data):
             for a1 in harmonics(y2, x2, -1):
                 antinodes.add(a1)
     antinodes.update(all_positions)
-    print_grid(positions, antinodes)
+    if display:
+        show(positions, antinodes, y_max, x_max)
     return len(antinodes)
 
 
@@ -129,6 +201,31 @@ class Day8(unittest.TestCase):
     def test_part2_example(self):
         self.assertEqual(34, part2(puzzle.examples[0].input_data))
 
+    def test_vectorized(self):
+        self.assertEqual(14, part1(puzzle.examples[0].input_data, vectorized=True))
+        self.assertEqual(34, part2(puzzle.examples[0].input_data, vectorized=True))
+        self.assertEqual(9, part2("T.........\n...T......\n.T........\n" + "..........\n" * 6 + "..........",
+                                  vectorized=True))
+
+    def test_part2_exact(self):
+        self.assertEqual(34, part2(puzzle.examples[0].input_data, exact=True))
+        self.assertEqual(2, part2("a..\n...\n..a"))
+        self.assertEqual(3, part2("a..\n...\n..a", exact=True))
+        self.assertEqual(5, part2("a....\n.a...\n..a..\n.....\n.....", exact=True))
+
+    def test_render(self):
+        example = ("..........\n"
+                   "...a......\n"
+                   "..........\n"
+                   "....a.....\n"
+                   "..........\n")
+        positions, y_max, x_max = parse(example)
+        self.assertEqual(".#........\n"
+                         "...a......\n"
+                         "..........\n"
+                         "....a.....\n"
+                         ".....#....\n", render(positions, {(0, 1), (4, 5)}, y_max, x_max))
+
     def test_part2(self):
         puzzle.answer_b = part2(puzzle.input_data)
 
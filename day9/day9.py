@@ -1,3 +1,7 @@
+import heapq
+import mmap
+import os
+import tempfile
 import unittest
 
 from aocd.models import Puzzle
@@ -9,6 +13,23 @@ def parse(input_data):
     return list(map(int, list(input_data)))
 
 
+def run_checksum(pos, length, file_id):
+    # sum of (pos + i) * file_id for i in range(length)
+    return file_id * (length * pos + length * (length - 1) // 2)
+
+
+def layout_checksum(runs):
+    return sum(run_checksum(pos, length, file_id) for pos, length, file_id in runs)
+
+
+def disk_runs(disk):
+    pos = 0
+    for idx, part in enumerate(disk):
+        if idx % 2 == 0:
+            yield pos, part, idx // 2
+        pos += part
+
+
 def place_blocks(disk):
     space = [0] * sum(disk)
     i = 0
@@ -49,14 +70,46 @@ def rearrange(disk):
         #         print(b, end='')
         # print()
 
-def part1(input_data):
-    disk = parse(input_data)
-    disk = rearrange(disk)
+def compact_checksum(disk, zero=0):
+    # fill gaps from the left with blocks taken from the last file, without expanding the disk
+    files, gaps = disk[0::2], disk[1::2]
+    left_id, right_id = 0, len(files) - 1
+    right_len = files[right_id] - zero
+    pos = 0
     result = 0
-    for idx, b in enumerate(disk):
-        result += idx * b
+    while left_id <= right_id:
+        file_len = files[left_id] - zero if left_id < right_id else right_len
+        result += run_checksum(pos, file_len, left_id)
+        pos += file_len
+        gap = gaps[left_id] - zero if left_id < len(gaps) else 0
+        while gap > 0 and left_id < right_id:
+            moved = min(gap, right_len)
+            result += run_checksum(pos, moved, right_id)
+            pos += moved
+            gap -= moved
+            right_len -= moved
+            if right_len == 0:
+                right_id -= 1
+                right_len = files[right_id] - zero
+        left_id += 1
     return result
 
+
+def part1(input_data):
+    return compact_checksum(parse(input_data))
+
+
+def part1_file(path):
+    # ASCII digits are read straight from the mapped file, files and gaps are strided views over it
+    with (open(path, 'rb') as file,
+          mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+          memoryview(data) as view):
+        size = len(view)
+        while size and view[size - 1] in b'\r\n':
+            size -= 1
+        with view[:size] as digits:
+            return compact_checksum(digits, zero=ord('0'))
+
 def update_spaces(old_spaces):
     new_spaces = []
     for pos, len in sorted(old_spaces):
@@ -84,6 +137,28 @@ def print_state(disk, files, spaces):
             print(file, end='')
     print()
 
+def move_files(files, spaces):
+    # one min-heap of gap positions per gap length, spaces are already sorted so every bucket is a valid heap
+    buckets = [[] for _ in range(10)]
+    for space_pos, space_len in spaces:
+        if space_len > 0:
+            buckets[space_len].append(space_pos)
+    for array_pos in reversed(range(len(files))):
+        file_pos, file_len, file_id = files[array_pos]
+        best_len = None
+        for space_len in range(file_len, 10):
+            if buckets[space_len] and buckets[space_len][0] < file_pos:  # move only to left
+                if best_len is None or buckets[space_len][0] < buckets[best_len][0]:
+                    best_len = space_len
+        if best_len is None:
+            continue
+        space_pos = heapq.heappop(buckets[best_len])
+        files[array_pos] = (space_pos, file_len, file_id)
+        if best_len > file_len:
+            heapq.heappush(buckets[best_len - file_len], space_pos + file_len)
+    return files
+
+
 def part2(input_data):
     disk = parse(input_data)
     files = []
@@ -100,25 +175,8 @@ def part2(input_data):
         pos += part
         full = not full
     # print_state(disk, files, spaces) # validation
-    for array_pos in reversed(range(len(files))):
-        file_pos, file_len, file_id = files[array_pos]
-        for space_array_pos in range(len(spaces)):
-            space_pos, space_len = spaces[space_array_pos]
-            if space_pos >= file_pos: # move only to left
-                break
-            if space_len >= file_len: # found space
-                files[array_pos] = (space_pos, file_len, file_id)
-                spaces[space_array_pos] = (space_pos + file_len, space_len - file_len)
-                # spaces.append((file_pos, file_len))  # not needed
-                # spaces = update_spaces(spaces) # not needed
-                # print(f'moving {file_id} to {space_pos}, space id {space_pos} left {space_len - file_len} length, new pos is {space_pos + file_len}')
-                break
-            # print_state(disk, files, spaces)
-    result = 0
-    for file_pos, file_len, file_id in files:
-        for i in range(file_len):
-            result += (file_pos + i) * file_id
-    return result
+    move_files(files, spaces)
+    return layout_checksum(files)
 
 class Day9(unittest.TestCase):
     def test_placing_blocks(self):
@@ -135,6 +193,24 @@ class Day9(unittest.TestCase):
     def test_part1_example(self):
         self.assertEqual(1928, part1(puzzle.examples[0].input_data))
 
+    def test_compact_checksum(self):
+        self.assertEqual(60, compact_checksum(parse("12345")))
+        self.assertEqual(0, compact_checksum(parse("9")))
+        self.assertEqual(3 * 1 + 2 * 2 + 1 * 3, compact_checksum(parse("1910101")))
+
+    def test_layout_checksum(self):
+        self.assertEqual(4 * (3 + 4 + 5), run_checksum(3, 3, 4))
+        disk = parse(puzzle.examples[0].input_data)
+        expected = sum(idx * b for idx, b in enumerate(place_blocks(disk)) if b is not None)
+        self.assertEqual(expected, layout_checksum(disk_runs(disk)))
+
+    def test_part1_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "disk.txt")
+            with open(path, "w") as file:
+                file.write(puzzle.examples[0].input_data + "\n")
+            self.assertEqual(1928, part1_file(path))
+
     def test_part1(self):
         puzzle.answer_a = part1(puzzle.input_data)
 